@@ -1,4 +1,6 @@
 import ast
+import hashlib
+import hmac
 import logging
 import json
 import nh3
@@ -6,15 +8,21 @@ import os
 import re
 import requests
 import requests_cache
+import secrets
+import threading
+import time
 import toml
 import uuid
 
 from bs4 import BeautifulSoup
 from bs4.element import DEFAULT_OUTPUT_ENCODING
-from collections import namedtuple
+from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import timedelta
 from dotenv import load_dotenv
+from feedgen.ext.base import BaseExtension
 from feedgen.feed import FeedGenerator
+from feedgen.util import xml_elem
 from flask import Flask, abort, make_response, redirect, render_template, request, send_from_directory, url_for
 from flask_htmx import HTMX
 from urllib.parse import urljoin, urlsplit
@@ -26,6 +34,52 @@ DATA_DIRECTORY = os.getenv("DATA_DIRECTORY")
 FEEDS_DIRECTORY = f'{DATA_DIRECTORY}/feeds'
 os.makedirs(FEEDS_DIRECTORY, exist_ok=True)
 
+# Feeds are refreshed adaptively: the interval is shortened when a refresh
+# finds new entries and lengthened when the source page has not changed.
+DEFAULT_REFRESH_INTERVAL = int(os.getenv("DEFAULT_REFRESH_INTERVAL", 60 * 60))
+MIN_REFRESH_INTERVAL = int(os.getenv("MIN_REFRESH_INTERVAL", 15 * 60))
+MAX_REFRESH_INTERVAL = int(os.getenv("MAX_REFRESH_INTERVAL", 7 * 24 * 60 * 60))
+REFRESH_BACKOFF_FACTOR = 2.0
+REFRESH_TIGHTEN_FACTOR = 0.5
+# Minimum number of seconds between two refresh fetches to the same origin
+ORIGIN_MIN_FETCH_INTERVAL = int(os.getenv("ORIGIN_MIN_FETCH_INTERVAL", 60))
+# Number of seconds between scans for feeds that are due for a refresh.
+# Set to 0 to disable the background scheduler.
+REFRESH_SCHEDULER_INTERVAL = int(os.getenv("REFRESH_SCHEDULER_INTERVAL", 60))
+
+# WebSub hub settings. The hub and feed URLs advertised to subscribers are
+# built from BASE_URL (e.g. https://site-to-feed.fly.dev), never from the
+# request's Host header. WebSub is disabled if BASE_URL is not set.
+BASE_URL = os.getenv("BASE_URL", "").rstrip('/')
+WEBSUB_SUBSCRIPTIONS_FILEPATH = f'{DATA_DIRECTORY}/websub_subscriptions.toml'
+WEBSUB_DEFAULT_LEASE_SECONDS = 10 * 24 * 60 * 60
+WEBSUB_MAX_LEASE_SECONDS = 30 * 24 * 60 * 60
+# Number of seconds to collect feed updates before delivering them together
+WEBSUB_BATCH_INTERVAL = int(os.getenv("WEBSUB_BATCH_INTERVAL", 5))
+WEBSUB_MAX_DELIVERY_ATTEMPTS = 5
+WEBSUB_RETRY_DELAY = 60
+WEBSUB_REQUEST_TIMEOUT = 10
+
+# Fetch failure handling: after CIRCUIT_BREAKER_THRESHOLD consecutive
+# failures, requests to an origin are skipped for an exponentially growing
+# delay. Client errors for a URL (e.g. 404) are cached for NEGATIVE_CACHE_TTL.
+# Circuits that are closed and have not failed for CIRCUIT_BREAKER_RESET_AFTER
+# seconds are forgotten.
+FETCH_TIMEOUT = 30
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_BASE_DELAY = 60
+CIRCUIT_BREAKER_MAX_DELAY = 24 * 60 * 60
+NEGATIVE_CACHE_TTL = 10 * 60
+CIRCUIT_BREAKER_RESET_AFTER = 60 * 60
+
+# Detail page enrichment: entry links are fetched in parallel, at most
+# DETAIL_MAX_CONCURRENCY_PER_HOST at a time per host, and fetches still
+# running after DETAIL_FETCH_TIME_BUDGET seconds keep the listing content.
+DETAIL_MAX_WORKERS = 8
+DETAIL_MAX_CONCURRENCY_PER_HOST = 2
+DETAIL_FETCH_TIME_BUDGET = int(os.getenv("DETAIL_FETCH_TIME_BUDGET", 20))
+DETAIL_FETCH_TIMEOUT = min(FETCH_TIMEOUT, DETAIL_FETCH_TIME_BUDGET)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -34,6 +88,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 FeedEntry = namedtuple('FeedEntry', ['title', 'link', 'content'])
+FetchResult = namedtuple('FetchResult', ['html', 'error'])
+OriginCircuit = namedtuple(
+    'OriginCircuit', ['failures', 'open_until', 'last_failure'])
+DetailFetch = namedtuple(
+    'DetailFetch', ['link', 'detail_content_pattern', 'future'])
+WebSubDelivery = namedtuple(
+    'WebSubDelivery', ['feed_id', 'callback', 'attempt', 'next_attempt'])
 
 app = Flask(__name__)
 htmx = HTMX(app)
@@ -44,6 +105,39 @@ session = requests_cache.CachedSession(
     use_temp=True
 )
 
+# Timestamp of the last fetch of a feed's source page for each origin
+# (scheme://netloc), guarded by refresh_lock
+origin_last_fetched: dict[str, float] = {}
+
+# Consecutive fetch failures for each origin, and failed fetches per URL.
+# Both are guarded by fetch_state_lock.
+fetch_state_lock = threading.Lock()
+# Circuits are keyed by (circuit, origin) so failing detail pages don't
+# block fetches of the listing page on the same origin.
+origin_circuits: dict[tuple[str, str], OriginCircuit] = {}
+negative_cache: dict[str, tuple[FetchResult, float]] = {}
+
+# Feeds with updates waiting to be delivered to WebSub subscribers, and
+# deliveries waiting to be retried. Both are guarded by websub_lock.
+websub_lock = threading.Lock()
+websub_pending_feeds: set[str] = set()
+websub_retries: list[WebSubDelivery] = []
+websub_worker: threading.Thread | None = None
+
+# Feeds currently being refreshed in the background, guarded by refresh_lock
+refresh_lock = threading.Lock()
+refreshing_feeds: set[str] = set()
+refresh_scheduler_stop = threading.Event()
+
+# Detail pages are fetched by a shared pool, limited per host across all
+# feeds. A fetch is only handed to the pool once its host has a free slot,
+# so fetches waiting on a busy host never hold a worker. detail_lock guards
+# the per-host state and the detail caches.
+detail_executor = ThreadPoolExecutor(max_workers=DETAIL_MAX_WORKERS)
+detail_lock = threading.Lock()
+detail_host_active: dict[str, int] = {}
+detail_host_queues: dict[str, deque[DetailFetch]] = {}
+
 
 class FeedConfig:
     def __init__(self, filepath):
@@ -131,6 +225,164 @@ class FeedConfig:
     def feed_type(self, value: str):
         self._data['feed_type'] = value
 
+    @property
+    def refresh_interval(self) -> int:
+        return int(self._data.get('refresh_interval', DEFAULT_REFRESH_INTERVAL))
+
+    @refresh_interval.setter
+    def refresh_interval(self, value: int):
+        self._data['refresh_interval'] = value
+
+    @property
+    def last_refreshed(self) -> float:
+        return float(self._data.get('last_refreshed', 0))
+
+    @last_refreshed.setter
+    def last_refreshed(self, value: float):
+        self._data['last_refreshed'] = value
+
+    @property
+    def entry_links(self) -> list[str] | None:
+        # None for feeds created before entry links were recorded
+        return self._data.get('entry_links')
+
+    @entry_links.setter
+    def entry_links(self, value: list[str]):
+        self._data['entry_links'] = value
+
+    @property
+    def refresh_count(self) -> int:
+        return int(self._data.get('refresh_count', 0))
+
+    @refresh_count.setter
+    def refresh_count(self, value: int):
+        self._data['refresh_count'] = value
+
+    @property
+    def change_count(self) -> int:
+        return int(self._data.get('change_count', 0))
+
+    @change_count.setter
+    def change_count(self, value: int):
+        self._data['change_count'] = value
+
+    @property
+    def detail_content_pattern(self) -> str:
+        return self._data.get('detail_content_pattern', '')
+
+    @detail_content_pattern.setter
+    def detail_content_pattern(self, value: str):
+        self._data['detail_content_pattern'] = value
+
+    @property
+    def next_refresh(self) -> float:
+        return self.last_refreshed + self.refresh_interval
+
+    def is_refresh_due(self, now: float) -> bool:
+        return now >= self.next_refresh
+
+    def record_entries(self, feed_entries: list[FeedEntry], now: float):
+        """
+        Record the entries written to the feed without adapting the
+        refresh interval, e.g. when the feed is edited.
+        """
+        self.entry_links = [entry.link for entry in feed_entries]
+        self.last_refreshed = now
+
+    def record_refresh(self, feed_entries: list[FeedEntry], now: float) -> bool:
+        """
+        Record the outcome of a refresh and compute the next refresh
+        interval.
+        Returns True if the refresh found entries that were not present
+        in the previous refresh. Removed or reordered entries don't count
+        as changes, and neither does the first refresh of a feed with no
+        recorded entries.
+        """
+        previous_links = self.entry_links
+        changed = previous_links is not None and not {
+            entry.link for entry in feed_entries} <= set(previous_links)
+
+        self.refresh_count = self.refresh_count + 1
+        if changed:
+            self.change_count = self.change_count + 1
+
+        self.refresh_interval = compute_refresh_interval(
+            self.refresh_interval,
+            changed
+        )
+        self.record_entries(feed_entries, now)
+
+        return changed
+
+    def save(self):
+        with open(self.filepath, 'w') as file:
+            toml.dump(self._data, file)
+
+
+class WebSubExtension(BaseExtension):
+    """
+    FeedGenerator extension that adds the WebSub hub link to RSS feeds,
+    whose output otherwise drops every link except the rel="self" link and
+    the channel link.
+    """
+
+    def __init__(self):
+        self.__hub = None
+
+    def hub(self, href: str | None = None) -> str | None:
+        if href is not None:
+            self.__hub = href
+        return self.__hub
+
+    def extend_rss(self, feed):
+        if self.__hub:
+            channel = feed[0]
+            xml_elem('{http://www.w3.org/2005/Atom}link',
+                     channel, href=self.__hub, rel='hub')
+        return feed
+
+
+class WebSubSubscriptions:
+    """
+    Subscriptions to the embedded WebSub hub, stored as a toml file of
+    feed_id -> callback URL -> subscription details.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._data = {}
+        if os.path.exists(filepath):
+            with open(filepath, 'r') as file:
+                self._data = toml.load(file)
+
+    def get(self, feed_id: str, now: float) -> dict[str, dict]:
+        """
+        Return the subscriptions to a feed whose lease has not expired.
+        """
+        subscriptions = self._data.get(feed_id, {})
+        return {
+            callback: subscription
+            for callback, subscription in subscriptions.items()
+            if subscription['expires'] > now
+        }
+
+    def add(self, feed_id: str, callback: str, topic: str, hub: str, secret: str, expires: float):
+        self._data.setdefault(feed_id, {})[callback] = {
+            'topic': topic,
+            'hub': hub,
+            'secret': secret,
+            'expires': expires
+        }
+
+    def remove(self, feed_id: str, callback: str):
+        subscriptions = self._data.get(feed_id, {})
+        subscriptions.pop(callback, None)
+        if not subscriptions:
+            self._data.pop(feed_id, None)
+
+    def remove_feed(self, feed_id: str):
+        self._data.pop(feed_id, None)
+
     def save(self):
         with open(self.filepath, 'w') as file:
             toml.dump(self._data, file)
@@ -148,7 +400,54 @@ def documentation():
 
 @app.route('/feeds/<path:feed_id>.xml', methods=['GET'])
 def feed_file(feed_id):
-    return send_from_directory(FEEDS_DIRECTORY, f"{feed_id}.xml")
+    # Serve the existing feed straight away and refresh it in the background
+    schedule_feed_refresh(feed_id)
+    response = send_from_directory(FEEDS_DIRECTORY, f"{feed_id}.xml")
+    # Advertise the hub so subscribers can discover it from the headers
+    if BASE_URL:
+        response.headers['Link'] = f'<{get_websub_hub_url()}>; rel="hub", <{get_feed_url(feed_id)}>; rel="self"'
+    return response
+
+
+@app.route('/websub/hub', methods=['POST'])
+def websub_hub():
+    if not BASE_URL:
+        return 'WebSub is not configured.', 404
+
+    mode = request.form.get('hub.mode')
+    if mode not in ('subscribe', 'unsubscribe'):
+        return 'hub.mode must be subscribe or unsubscribe.', 400
+
+    callback = request.form.get('hub.callback')
+    if not callback or not is_absolute_url(callback):
+        return 'hub.callback must be an absolute URL.', 400
+
+    topic = request.form.get('hub.topic')
+    if not topic:
+        return 'hub.topic is required.', 400
+
+    feed_id = get_feed_id_from_topic(topic)
+    if not feed_id:
+        return 'hub.topic is not a feed published by this hub.', 404
+
+    try:
+        lease_seconds = int(request.form.get(
+            'hub.lease_seconds', WEBSUB_DEFAULT_LEASE_SECONDS))
+    except ValueError:
+        return 'hub.lease_seconds must be a number.', 400
+    lease_seconds = min(max(lease_seconds, 1), WEBSUB_MAX_LEASE_SECONDS)
+
+    secret = request.form.get('hub.secret', '')
+    hub_url = get_websub_hub_url()
+
+    # Verification of intent happens asynchronously, as allowed by the spec
+    threading.Thread(
+        target=verify_websub_intent,
+        args=(mode, feed_id, callback, topic, hub_url, secret, lease_seconds),
+        daemon=True
+    ).start()
+
+    return '', 202
 
 
 @app.route('/feeds/<path:feed_id>', methods=['GET'])
@@ -162,10 +461,13 @@ def view_feed(feed_id):
 
     config = FeedConfig(feed_toml_filepath)
 
-    html_source = get_html(config.url)
+    mark_origin_fetched(config.url, time.time())
+    fetch_result = get_html(config.url)
+    if fetch_result.error:
+        return fetch_result.error
 
     extracted_html = parse_html_via_patterns(
-        html_source,
+        fetch_result.html,
         config.global_search_pattern,
         config.item_search_pattern,
         config.feed_link
@@ -179,6 +481,10 @@ def view_feed(feed_id):
         config.item_content_position
     )
 
+    if config.detail_content_pattern:
+        feed_entries = enrich_feed_entries(
+            feed_id, feed_entries, config.detail_content_pattern)
+
     # Create a dict to pass to the template to preview the feed
     feed_preview = {
         'title': config.feed_title,
@@ -193,7 +499,8 @@ def view_feed(feed_id):
         feed_id=feed_id,
         item_title_position=config.item_title_position,
         item_link_position=config.item_link_position,
-        item_content_position=config.item_content_position
+        item_content_position=config.item_content_position,
+        detail_content_pattern=config.detail_content_pattern
     )
 
 
@@ -223,11 +530,21 @@ def edit_feed(feed_id):
         config.feed_description = feed_description
         config.save()
 
-    html_source = get_html(config.url)
+    # An empty value disables detail page enrichment
+    detail_content_pattern = request.form.get('detail-content-pattern')
+    if detail_content_pattern is not None:
+        config.detail_content_pattern = detail_content_pattern.strip()
+        config.save()
+
+    mark_origin_fetched(config.url, time.time())
+    fetch_result = get_html(config.url, refresh=True)
+    if fetch_result.error:
+        # Keep the last good feed instead of overwriting it
+        return fetch_result.error
 
     try:
         extracted_html = parse_html_via_patterns(
-            html_source,
+            fetch_result.html,
             config.global_search_pattern,
             config.item_search_pattern,
             config.feed_link
@@ -241,7 +558,9 @@ def edit_feed(feed_id):
         feed_id,
         config.feed_title,
         config.feed_link,
-        config.feed_description
+        config.feed_description,
+        self_url=get_feed_url(feed_id),
+        hub_url=get_websub_hub_url()
     )
 
     # Convert the html into a list of named tuples
@@ -252,17 +571,19 @@ def edit_feed(feed_id):
         config.item_content_position
     )
 
+    if config.detail_content_pattern:
+        feed_entries = enrich_feed_entries(
+            feed_id, feed_entries, config.detail_content_pattern)
+
     add_entries_to_feed(feed, feed_entries)
 
+    previous_fingerprint = get_feed_xml_fingerprint(feed_xml_filepath)
+
+    if config.feed_type not in ('atom', 'rss'):
+        return '<p>Error: Feed type is required.</p>'
+
     try:
-        if config.feed_type == 'atom':
-            # Write the ATOM feed to a file
-            feed.atom_file(feed_xml_filepath)
-        elif config.feed_type == 'rss':
-            # Write the RSS feed to a file
-            feed.rss_file(feed_xml_filepath)
-        else:
-            return '<p>Error: Feed type is required.</p>'
+        write_feed_file(feed, config.feed_type, feed_xml_filepath)
     except ValueError as error:
         logger.error(f"{error=}")
         return '<p>Error: Feed title is required.</p>'
@@ -270,6 +591,12 @@ def edit_feed(feed_id):
         logger.error(f"{error=}")
         return '<p>Error: Unable to create feed.</p>'
 
+    # An edit is not a scheduled refresh, so the interval is left as is
+    config.record_entries(feed_entries, time.time())
+    config.save()
+    if get_feed_xml_fingerprint(feed_xml_filepath) != previous_fingerprint:
+        publish_feed_update(feed_id)
+
     # Create a dict to pass to the template to preview the feed
     feed_preview = {
         'title': feed_title,
@@ -278,7 +605,7 @@ def edit_feed(feed_id):
         'entries': feed_entries
     }
 
-    return render_template('feed.html', feed_id=feed_id, feed=feed_preview)
+    return render_template('feed.html', feed_id=feed_id, feed=feed_preview, detail_content_pattern=config.detail_content_pattern)
 
 
 @app.route('/feeds/<path:feed_id>/delete', methods=['POST', 'DELETE'])
@@ -296,6 +623,15 @@ def delete_feed(feed_id):
             os.remove(feed_toml_filepath)
         else:
             logger.error('Feed TOML file does not exist.')
+
+        feed_details_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.details.toml"
+        if os.path.exists(feed_details_filepath):
+            os.remove(feed_details_filepath)
+
+        with websub_lock:
+            subscriptions = WebSubSubscriptions(WEBSUB_SUBSCRIPTIONS_FILEPATH)
+            subscriptions.remove_feed(feed_id)
+            subscriptions.save()
     else:
         return '<p>Error: Feed file does not exist.</p>'
 
@@ -314,7 +650,10 @@ def step_1():
         return '<p>Error: URL is required.</p>'
     logger.debug(f"/get_html: {url=}")
 
-    html_source = get_html(url)
+    fetch_result = get_html(url)
+    if fetch_result.error:
+        return fetch_result.error
+    html_source = fetch_result.html
 
     # Manual process
     if 'get_html' in request.args:
@@ -337,7 +676,9 @@ def step_1():
             feed_id,
             feed_title,
             feed_link,
-            feed_description
+            feed_description,
+            self_url=get_feed_url(feed_id),
+            hub_url=get_websub_hub_url()
         )
 
         try:
@@ -388,7 +729,10 @@ def step_1():
             'item_title_position': item_title_position,
             'item_link_position': item_link_position,
             'item_content_position': item_content_position,
-            'feed_type': "atom"
+            'feed_type': "atom",
+            'refresh_interval': DEFAULT_REFRESH_INTERVAL,
+            'last_refreshed': time.time(),
+            'entry_links': [entry.link for entry in feed_entries]
         }
         with open(f"{feed_filepath}.toml", 'w') as file:
             toml.dump(config, file)
@@ -510,7 +854,9 @@ def step_3():
         feed_id,
         feed_title,
         feed_link,
-        feed_description
+        feed_description,
+        self_url=get_feed_url(feed_id),
+        hub_url=get_websub_hub_url()
     )
 
     # Convert the html into a list of named tuples
@@ -551,7 +897,10 @@ def step_3():
         'item_title_position': item_title_position,
         'item_link_position': item_link_position,
         'item_content_position': item_content_position,
-        'feed_type': feed_type
+        'feed_type': feed_type,
+        'refresh_interval': DEFAULT_REFRESH_INTERVAL,
+        'last_refreshed': time.time(),
+        'entry_links': [entry.link for entry in feed_entries]
     }
     with open(f"{feed_filepath}.toml", 'w') as file:
         toml.dump(config, file)
@@ -574,9 +923,41 @@ def step_3():
         return render_template('step_4_get_rss_feed.html', feed=feed_preview, feed_id=feed_id, extracted_html=extracted_html, html_source=html_source, url=url)
 
 
-def get_html(url: str):
+def get_html(url: str, refresh: bool = False, timeout: float = FETCH_TIMEOUT, circuit: str = 'listing') -> FetchResult:
+    """
+    Fetch, sanitize, and prettify the HTML at url.
+    On failure, the result's error holds an HTML error message and html is
+    None. Set refresh to check with the server instead of reusing a cached
+    response. Repeated failures open the named circuit for the URL's origin,
+    and client errors are cached for the URL, so broken sites are not
+    fetched again until their backoff delay has passed.
+    """
+    now = time.time()
+    origin = get_origin(url)
+    circuit_key = (circuit, origin)
+
+    with fetch_state_lock:
+        cached = negative_cache.get(url)
+        if cached and cached[1] <= now:
+            negative_cache.pop(url, None)
+            cached = None
+        origin_circuit = origin_circuits.get(circuit_key)
+
+    if cached:
+        logger.info(f"Using cached fetch failure for {url=}")
+        return cached[0]
+
+    if origin_circuit and origin_circuit.open_until > now:
+        logger.info(f"Skipping fetch of {url=}; circuit for {origin=} is open.")
+        return FetchResult(None, '<p>Error: The site is temporarily unavailable. Please try again later.</p>')
+
     try:
-        response = session.get(url)
+        response = session.get(url, timeout=timeout, refresh=refresh)
+        # A cached response without ETag or Last-Modified can't be
+        # revalidated, so it has to be fetched again
+        if refresh and response.from_cache and not ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            response = session.get(
+                url, timeout=timeout, force_refresh=True)
         response.raise_for_status()
         logger.info(f"Request successful: {response.status_code}")
 
@@ -585,16 +966,72 @@ def get_html(url: str):
         soup = BeautifulSoup(sanitized_html, 'html.parser')
         pretty_html = soup.prettify()
 
-        return pretty_html
+        with fetch_state_lock:
+            origin_circuits.pop(circuit_key, None)
+        return FetchResult(pretty_html, None)
     except requests.exceptions.HTTPError as error:
         logger.error(f"{error=}")
-        return f'<p>Error: HTTP error occurred. {error}</p>'
+        fetch_result = FetchResult(
+            None, f'<p>Error: HTTP error occurred. {error}</p>')
+        status_code = error.response.status_code if error.response is not None else 500
+        if status_code >= 500 or status_code == 429:
+            record_origin_failure(circuit_key, now)
+        else:
+            with fetch_state_lock:
+                prune_fetch_state(now)
+                negative_cache[url] = (
+                    fetch_result, now + NEGATIVE_CACHE_TTL)
+        return fetch_result
     except requests.exceptions.ConnectionError as error:
         logger.error(f"{error=}")
-        return '<p>Error: Invalid URL.</p>'
+        record_origin_failure(circuit_key, now)
+        return FetchResult(None, '<p>Error: Invalid URL.</p>')
     except requests.exceptions.RequestException as error:
         logger.error(f"{error=}")
-        return f"<p>Error: {error}</p>"
+        record_origin_failure(circuit_key, now)
+        return FetchResult(None, f"<p>Error: {error}</p>")
+
+
+def record_origin_failure(circuit_key: tuple[str, str], now: float) -> None:
+    """
+    Count a failed fetch for the origin and, once the threshold is
+    reached, open its circuit for an exponentially increasing delay.
+    """
+    circuit, origin = circuit_key
+    with fetch_state_lock:
+        prune_fetch_state(now)
+        origin_circuit = origin_circuits.get(
+            circuit_key, OriginCircuit(0, 0, 0))
+        failures = origin_circuit.failures + 1
+        open_until = origin_circuit.open_until
+
+        if failures >= CIRCUIT_BREAKER_THRESHOLD:
+            delay = CIRCUIT_BREAKER_BASE_DELAY * \
+                2 ** (failures - CIRCUIT_BREAKER_THRESHOLD)
+            open_until = now + min(delay, CIRCUIT_BREAKER_MAX_DELAY)
+
+        origin_circuits[circuit_key] = OriginCircuit(
+            failures, open_until, now)
+
+    if failures >= CIRCUIT_BREAKER_THRESHOLD:
+        logger.info(
+            f"{circuit.capitalize()} circuit for {origin=} open for {open_until - now}s")
+
+
+def prune_fetch_state(now: float) -> None:
+    """
+    Drop expired negative cache entries and circuits that are closed and
+    have not failed recently, so failures on URLs and origins that are
+    never fetched again don't accumulate.
+    Must be called with fetch_state_lock held.
+    """
+    for url, (_, expires) in list(negative_cache.items()):
+        if expires <= now:
+            del negative_cache[url]
+
+    for circuit_key, origin_circuit in list(origin_circuits.items()):
+        if origin_circuit.open_until <= now and now - origin_circuit.last_failure >= CIRCUIT_BREAKER_RESET_AFTER:
+            del origin_circuits[circuit_key]
 
 
 def is_absolute_url(url):
@@ -691,17 +1128,45 @@ def parse_html_via_patterns(html_doc: str, global_search_pattern: str, item_sear
     return extracted_html
 
 
-def generate_feed(feed_id: str, feed_title: str, feed_link: str, feed_description, feed_language: str = 'en') -> FeedGenerator:
+def generate_feed(feed_id: str, feed_title: str, feed_link: str, feed_description, feed_language: str = 'en', self_url: str | None = None, hub_url: str | None = None) -> FeedGenerator:
     fg = FeedGenerator()
     fg.id(feed_id)
     fg.title(feed_title)
-    fg.link(href=feed_link, rel='self')
+    if self_url and hub_url:
+        # RSS output only keeps the rel="self" link and the last link added,
+        # which becomes the channel link. The hub is added to RSS by
+        # WebSubExtension, and the source page link is added last.
+        fg.register_extension('websub', WebSubExtension, atom=False)
+        fg.websub.hub(hub_url)
+        fg.link(href=hub_url, rel='hub')
+        fg.link(href=self_url, rel='self')
+        fg.link(href=feed_link, rel='alternate')
+    else:
+        fg.link(href=feed_link, rel='self')
     fg.subtitle(feed_description)
     fg.language(feed_language)
 
     return fg
 
 
+def write_feed_file(fg: FeedGenerator, feed_type: str, feed_xml_filepath: str) -> None:
+    """
+    Write the feed to a uniquely named temporary file and move it into
+    place, so readers never see a partial feed and concurrent edits and
+    refreshes never interleave.
+    """
+    feed_xml_tmp_filepath = f"{feed_xml_filepath}.{uuid.uuid4().hex}.tmp"
+    try:
+        if feed_type == 'atom':
+            fg.atom_file(feed_xml_tmp_filepath)
+        else:
+            fg.rss_file(feed_xml_tmp_filepath)
+        os.replace(feed_xml_tmp_filepath, feed_xml_filepath)
+    finally:
+        if os.path.exists(feed_xml_tmp_filepath):
+            os.remove(feed_xml_tmp_filepath)
+
+
 def add_entries_to_feed(fg: FeedGenerator, entries: list[FeedEntry]) -> None:
     """
     The entries do not currently posses a datetime.
@@ -739,5 +1204,550 @@ def create_feed_entries_from_html(html: dict, item_title_position: int, item_lin
     return feed_entries
 
 
+def extract_detail_content(html_doc: str, detail_content_pattern: str) -> str | None:
+    """
+    Return the text of the first element matching the pattern (e.g.
+    <article>) on an entry's detail page.
+    """
+    translation_table = str.maketrans("", "", '{}*%"=<>/')
+    tag = detail_content_pattern.translate(translation_table)
+
+    element = BeautifulSoup(html_doc, 'html.parser').find(tag)
+    if not element:
+        return None
+
+    content = element.get_text(separator='\n', strip=True)
+    return content or None
+
+
+def load_detail_contents(feed_details_filepath: str, detail_content_pattern: str) -> dict[str, str]:
+    cache = {}
+    if os.path.exists(feed_details_filepath):
+        with open(feed_details_filepath, 'r') as file:
+            cache = toml.load(file)
+
+    # Cached content is only valid for the pattern it was extracted with
+    if cache.get('detail_content_pattern') != detail_content_pattern:
+        return {}
+
+    return cache.get('contents', {})
+
+
+def submit_detail_fetch(link: str, detail_content_pattern: str) -> Future:
+    """
+    Start fetching an entry's detail page if its host has a free slot, or
+    queue the fetch for the host otherwise.
+    """
+    detail_fetch = DetailFetch(link, detail_content_pattern, Future())
+    host = urlsplit(link).netloc
+
+    with detail_lock:
+        if detail_host_active.get(host, 0) < DETAIL_MAX_CONCURRENCY_PER_HOST:
+            detail_host_active[host] = detail_host_active.get(host, 0) + 1
+            start = True
+        else:
+            detail_host_queues.setdefault(host, deque()).append(detail_fetch)
+            start = False
+
+    if start:
+        detail_executor.submit(run_detail_fetches, host, detail_fetch)
+    return detail_fetch.future
+
+
+def run_detail_fetches(host: str, detail_fetch: DetailFetch) -> None:
+    """
+    Run a detail fetch, then use the same host slot for the fetches queued
+    for the host until none are left. Cancelled fetches are skipped.
+    """
+    while True:
+        if detail_fetch.future.set_running_or_notify_cancel():
+            try:
+                detail_fetch.future.set_result(fetch_detail_content(
+                    detail_fetch.link, detail_fetch.detail_content_pattern))
+            except Exception as error:
+                detail_fetch.future.set_exception(error)
+
+        with detail_lock:
+            queue = detail_host_queues.get(host)
+            if queue:
+                detail_fetch = queue.popleft()
+                if not queue:
+                    del detail_host_queues[host]
+            else:
+                detail_host_active[host] -= 1
+                if not detail_host_active[host]:
+                    del detail_host_active[host]
+                return
+
+
+def fetch_detail_content(link: str, detail_content_pattern: str) -> str | None:
+    """
+    Fetch an entry's detail page and extract its content.
+    """
+    fetch_result = get_html(
+        link, timeout=DETAIL_FETCH_TIMEOUT, circuit='detail')
+    if fetch_result.error:
+        return None
+    return extract_detail_content(fetch_result.html, detail_content_pattern)
+
+
+def enrich_feed_entries(feed_id: str, entries: list[FeedEntry], detail_content_pattern: str) -> list[FeedEntry]:
+    """
+    Replace each entry's content with the content extracted from the page
+    at its link.
+    Extracted content is cached per link, so only new entries are fetched.
+    Entries whose page could not be fetched or parsed within the time
+    budget keep the content from the listing page.
+    """
+    feed_details_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.details.toml"
+
+    with detail_lock:
+        contents = load_detail_contents(
+            feed_details_filepath, detail_content_pattern)
+
+    links = {entry.link for entry in entries if entry.link}
+    new_links = [link for link in links if link not in contents]
+
+    new_contents = {}
+    if new_links:
+        futures = {
+            submit_detail_fetch(link, detail_content_pattern): link
+            for link in new_links
+        }
+        done, not_done = wait(futures, timeout=DETAIL_FETCH_TIME_BUDGET)
+
+        if not_done:
+            logger.info(
+                f"{len(not_done)} detail pages for {feed_id=} exceeded the time budget")
+            for future in not_done:
+                future.cancel()
+
+        for future in done:
+            try:
+                content = future.result()
+            except Exception as error:
+                logger.error(f"{error=}")
+                continue
+            if content:
+                new_contents[futures[future]] = content
+
+    with detail_lock:
+        # Merge with content cached by concurrent enrichments of this feed
+        contents = load_detail_contents(
+            feed_details_filepath, detail_content_pattern)
+        contents.update(new_contents)
+        # Drop entries that are no longer in the feed
+        contents = {
+            link: content for link, content in contents.items() if link in links}
+        with open(feed_details_filepath, 'w') as file:
+            toml.dump({
+                'detail_content_pattern': detail_content_pattern,
+                'contents': contents
+            }, file)
+
+    return [
+        entry._replace(content=contents.get(entry.link, entry.content))
+        for entry in entries
+    ]
+
+
+def compute_refresh_interval(current_interval: int, changed: bool) -> int:
+    """
+    Tighten the refresh interval for feeds whose source page produced new
+    entries, and back off for feeds whose source page stayed the same.
+    """
+    if changed:
+        interval = current_interval * REFRESH_TIGHTEN_FACTOR
+    else:
+        interval = current_interval * REFRESH_BACKOFF_FACTOR
+
+    return int(min(max(interval, MIN_REFRESH_INTERVAL), MAX_REFRESH_INTERVAL))
+
+
+def get_origin(url: str) -> str:
+    url_components = urlsplit(url)
+    return f"{url_components.scheme}://{url_components.netloc}"
+
+
+def claim_origin_fetch(url: str, now: float) -> bool:
+    """
+    Record a refresh fetch to the URL's origin, unless the origin was
+    fetched less than ORIGIN_MIN_FETCH_INTERVAL seconds ago.
+    Returns True if the fetch may go ahead.
+    """
+    origin = get_origin(url)
+    with refresh_lock:
+        if now - origin_last_fetched.get(origin, 0) < ORIGIN_MIN_FETCH_INTERVAL:
+            return False
+        origin_last_fetched[origin] = now
+    return True
+
+
+def mark_origin_fetched(url: str, now: float) -> None:
+    """
+    Record a fetch made on a user's behalf, which is never delayed but
+    still spaces out the following refreshes of the origin.
+    """
+    with refresh_lock:
+        origin_last_fetched[get_origin(url)] = now
+
+
+def claim_feed_refresh(feed_id: str) -> bool:
+    """
+    Mark the feed as being refreshed. Returns False if a refresh of the
+    feed is already running.
+    """
+    with refresh_lock:
+        if feed_id in refreshing_feeds:
+            return False
+        refreshing_feeds.add(feed_id)
+    return True
+
+
+def is_feed_refresh_due(feed_id: str, now: float) -> bool:
+    feed_toml_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.toml"
+    if not os.path.exists(feed_toml_filepath):
+        return False
+    return FeedConfig(feed_toml_filepath).is_refresh_due(now)
+
+
+def schedule_feed_refresh(feed_id: str) -> None:
+    """
+    Start refreshing the feed in a background thread if a refresh is due
+    and one is not already running.
+    This is a fallback for feeds requested between scheduler scans.
+    """
+    if not is_feed_refresh_due(feed_id, time.time()):
+        return
+    if not claim_feed_refresh(feed_id):
+        return
+
+    threading.Thread(
+        target=run_feed_refresh, args=(feed_id,), daemon=True).start()
+
+
+def refresh_due_feeds(now: float) -> None:
+    """
+    Refresh every feed whose refresh interval has elapsed.
+    Feeds skipped because their origin was fetched recently are picked up
+    by a later scan.
+    """
+    feed_ids = sorted(
+        filename.removesuffix('.toml')
+        for filename in os.listdir(FEEDS_DIRECTORY)
+        if filename.endswith('.toml') and not filename.endswith('.details.toml')
+    )
+
+    for feed_id in feed_ids:
+        if not is_feed_refresh_due(feed_id, now):
+            continue
+        if not claim_feed_refresh(feed_id):
+            continue
+        run_feed_refresh(feed_id)
+
+
+def run_refresh_scheduler(stop: threading.Event) -> None:
+    while not stop.wait(REFRESH_SCHEDULER_INTERVAL):
+        try:
+            refresh_due_feeds(time.time())
+        except Exception as error:
+            logger.error(f"{error=}")
+
+
+def start_refresh_scheduler() -> None:
+    threading.Thread(
+        target=run_refresh_scheduler, args=(refresh_scheduler_stop,), daemon=True).start()
+
+
+def run_feed_refresh(feed_id: str) -> None:
+    try:
+        refresh_feed(feed_id)
+    except Exception as error:
+        logger.error(f"Unable to refresh {feed_id=}; {error=}")
+    finally:
+        with refresh_lock:
+            refreshing_feeds.discard(feed_id)
+
+
+def refresh_feed(feed_id: str) -> None:
+    """
+    Regenerate the feed's XML file if its refresh interval has elapsed.
+    The existing XML file is left untouched if the refresh is not due,
+    the origin was fetched too recently, or the refresh fails.
+    """
+    feed_xml_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.xml"
+    feed_toml_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.toml"
+
+    if not os.path.exists(feed_xml_filepath) or not os.path.exists(feed_toml_filepath):
+        return
+
+    config = FeedConfig(feed_toml_filepath)
+
+    now = time.time()
+    if not config.is_refresh_due(now):
+        return
+
+    if not claim_origin_fetch(config.url, now):
+        logger.info(f"Skipping refresh of {feed_id=}; origin was fetched recently.")
+        return
+
+    # Bypass the HTTP cache so the refresh sees the current page
+    fetch_result = get_html(config.url, refresh=True)
+    if fetch_result.error:
+        # Keep serving the last good feed
+        logger.info(f"Skipping refresh of {feed_id=}; fetch failed.")
+        return
+
+    try:
+        extracted_html = parse_html_via_patterns(
+            fetch_result.html,
+            config.global_search_pattern,
+            config.item_search_pattern,
+            config.feed_link
+        )
+
+        feed_entries = create_feed_entries_from_html(
+            extracted_html,
+            config.item_title_position,
+            config.item_link_position,
+            config.item_content_position
+        )
+    except Exception as error:
+        logger.error(f"Unable to refresh {feed_id=}; {error=}")
+        return
+
+    if config.detail_content_pattern:
+        feed_entries = enrich_feed_entries(
+            feed_id, feed_entries, config.detail_content_pattern)
+
+    feed = generate_feed(
+        feed_id,
+        config.feed_title,
+        config.feed_link,
+        config.feed_description,
+        self_url=get_feed_url(feed_id),
+        hub_url=get_websub_hub_url()
+    )
+
+    add_entries_to_feed(feed, feed_entries)
+
+    previous_fingerprint = get_feed_xml_fingerprint(feed_xml_filepath)
+
+    if config.feed_type not in ('atom', 'rss'):
+        logger.error(f"Unable to refresh {feed_id=}; unknown feed type.")
+        return
+
+    try:
+        write_feed_file(feed, config.feed_type, feed_xml_filepath)
+    except Exception as error:
+        logger.error(f"Unable to refresh {feed_id=}; {error=}")
+        return
+
+    changed = config.record_refresh(feed_entries, now)
+    config.save()
+    if get_feed_xml_fingerprint(feed_xml_filepath) != previous_fingerprint:
+        publish_feed_update(feed_id)
+    logger.info(
+        f"Refreshed {feed_id=}; {changed=}; next refresh in {config.refresh_interval}s")
+
+
+def get_websub_hub_url() -> str | None:
+    if not BASE_URL:
+        return None
+    return f"{BASE_URL}/websub/hub"
+
+
+def get_feed_url(feed_id: str) -> str | None:
+    if not BASE_URL:
+        return None
+    return f"{BASE_URL}/feeds/{feed_id}.xml"
+
+
+def get_feed_id_from_topic(topic: str) -> str | None:
+    """
+    Return the feed_id for a topic URL of the form
+    <BASE_URL>/feeds/<feed_id>.xml, or None if the topic does not refer to
+    an existing feed.
+    """
+    match = re.fullmatch(r'/feeds/(\w+)\.xml', urlsplit(topic).path)
+    if not match:
+        return None
+
+    feed_id = match.group(1)
+    if topic != get_feed_url(feed_id):
+        return None
+    if not os.path.exists(f"{FEEDS_DIRECTORY}/{feed_id}.xml"):
+        return None
+
+    return feed_id
+
+
+def get_feed_xml_fingerprint(feed_xml_filepath: str) -> str:
+    """
+    Hash a feed's XML file, ignoring the timestamps FeedGenerator sets on
+    every generation, so regenerating an unchanged feed keeps its hash.
+    """
+    if not os.path.exists(feed_xml_filepath):
+        return ''
+
+    with open(feed_xml_filepath, 'r') as file:
+        feed_xml = file.read()
+    feed_xml = re.sub(
+        r'<(updated|lastBuildDate)>[^<]*</\1>', '', feed_xml)
+
+    return hashlib.sha256(feed_xml.encode('utf-8')).hexdigest()
+
+
+def verify_websub_intent(mode: str, feed_id: str, callback: str, topic: str, hub_url: str, secret: str, lease_seconds: int) -> bool:
+    """
+    Confirm with the subscriber that it requested the (un)subscription by
+    having it echo back a random challenge, then apply the request.
+    """
+    challenge = secrets.token_urlsafe(32)
+    params = {
+        'hub.mode': mode,
+        'hub.topic': topic,
+        'hub.challenge': challenge
+    }
+    if mode == 'subscribe':
+        params['hub.lease_seconds'] = lease_seconds
+
+    try:
+        response = requests.get(
+            callback, params=params, timeout=WEBSUB_REQUEST_TIMEOUT)
+        verified = response.ok and response.text.strip() == challenge
+    except requests.exceptions.RequestException as error:
+        logger.error(f"{error=}")
+        verified = False
+
+    if not verified:
+        logger.info(f"WebSub {mode} not verified for {callback=}; {topic=}")
+        return False
+
+    with websub_lock:
+        subscriptions = WebSubSubscriptions(WEBSUB_SUBSCRIPTIONS_FILEPATH)
+        if mode == 'subscribe':
+            expires = time.time() + lease_seconds
+            subscriptions.add(feed_id, callback, topic,
+                              hub_url, secret, expires)
+        else:
+            subscriptions.remove(feed_id, callback)
+        subscriptions.save()
+
+    logger.info(f"WebSub {mode} verified for {callback=}; {topic=}")
+    return True
+
+
+def publish_feed_update(feed_id: str) -> None:
+    """
+    Queue a notification for the feed's WebSub subscribers.
+    Updates to the same feed within one batch interval are delivered once.
+    """
+    global websub_worker
+
+    with websub_lock:
+        websub_pending_feeds.add(feed_id)
+
+        if websub_worker is None or not websub_worker.is_alive():
+            websub_worker = threading.Thread(
+                target=run_websub_worker, daemon=True)
+            websub_worker.start()
+
+
+def run_websub_worker() -> None:
+    while True:
+        time.sleep(WEBSUB_BATCH_INTERVAL)
+        try:
+            deliver_websub_notifications(time.time())
+        except Exception as error:
+            logger.error(f"{error=}")
+
+
+def deliver_websub_notifications(now: float) -> None:
+    """
+    Deliver pending feed updates and due retries to subscribers.
+    Failed deliveries are retried with exponential backoff.
+    """
+    with websub_lock:
+        subscriptions = WebSubSubscriptions(WEBSUB_SUBSCRIPTIONS_FILEPATH)
+        deliveries = {}
+        for feed_id in websub_pending_feeds:
+            for callback in subscriptions.get(feed_id, now):
+                deliveries[(feed_id, callback)] = 1
+        websub_pending_feeds.clear()
+
+        # A fresh update supersedes any queued retry for the same subscriber
+        remaining_retries = []
+        for retry in websub_retries:
+            if (retry.feed_id, retry.callback) in deliveries:
+                continue
+            if retry.next_attempt <= now:
+                deliveries[(retry.feed_id, retry.callback)] = retry.attempt
+            else:
+                remaining_retries.append(retry)
+        websub_retries[:] = remaining_retries
+
+    feed_contents = {}
+    for (feed_id, callback), attempt in deliveries.items():
+        subscription = subscriptions.get(feed_id, now).get(callback)
+        if not subscription:
+            continue
+
+        if feed_id not in feed_contents:
+            feed_xml_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.xml"
+            feed_toml_filepath = f"{FEEDS_DIRECTORY}/{feed_id}.toml"
+            if not os.path.exists(feed_xml_filepath) or not os.path.exists(feed_toml_filepath):
+                continue
+            with open(feed_xml_filepath, 'rb') as file:
+                feed_contents[feed_id] = (
+                    file.read(), FeedConfig(feed_toml_filepath).feed_type)
+        content, feed_type = feed_contents[feed_id]
+
+        status = deliver_websub_notification(subscription, callback, content, feed_type)
+        if status == 410:
+            # The subscriber no longer wants updates
+            with websub_lock:
+                subscriptions = WebSubSubscriptions(
+                    WEBSUB_SUBSCRIPTIONS_FILEPATH)
+                subscriptions.remove(feed_id, callback)
+                subscriptions.save()
+        elif not status or status >= 300:
+            if attempt < WEBSUB_MAX_DELIVERY_ATTEMPTS:
+                next_attempt = now + WEBSUB_RETRY_DELAY * 2 ** (attempt - 1)
+                with websub_lock:
+                    websub_retries.append(WebSubDelivery(
+                        feed_id, callback, attempt + 1, next_attempt))
+            else:
+                logger.error(
+                    f"Giving up WebSub delivery to {callback=} for {feed_id=}")
+
+
+def deliver_websub_notification(subscription: dict, callback: str, content: bytes, feed_type: str) -> int | None:
+    """
+    POST the feed content to a subscriber.
+    Returns the response status code, or None if the request failed.
+    """
+    headers = {
+        'Content-Type': f"application/{feed_type}+xml",
+        'Link': f'<{subscription["hub"]}>; rel="hub", <{subscription["topic"]}>; rel="self"'
+    }
+    if subscription['secret']:
+        signature = hmac.new(
+            subscription['secret'].encode('utf-8'), content, hashlib.sha256).hexdigest()
+        headers['X-Hub-Signature'] = f"sha256={signature}"
+
+    try:
+        response = requests.post(
+            callback, data=content, headers=headers, timeout=WEBSUB_REQUEST_TIMEOUT)
+        logger.info(f"WebSub delivery to {callback=}: {response.status_code}")
+        return response.status_code
+    except requests.exceptions.RequestException as error:
+        logger.error(f"{error=}")
+        return None
+
+
+if REFRESH_SCHEDULER_INTERVAL > 0:
+    start_refresh_scheduler()
+
 if __name__ == '__main__':
     app.run(debug=True)
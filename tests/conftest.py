@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# app.py creates its data directories at import time
+os.environ.setdefault('DATA_DIRECTORY', tempfile.mkdtemp())
+# Tests drive refreshes themselves instead of the background scheduler
+os.environ['REFRESH_SCHEDULER_INTERVAL'] = '0'
+
+from site_to_feed import app as site_to_feed_app  # noqa: E402
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    feeds_directory = tmp_path / 'feeds'
+    feeds_directory.mkdir()
+    monkeypatch.setattr(site_to_feed_app, 'FEEDS_DIRECTORY', str(feeds_directory))
+    monkeypatch.setattr(site_to_feed_app, 'ORIGIN_MIN_FETCH_INTERVAL', 0)
+
+    site_to_feed_app.origin_last_fetched.clear()
+    site_to_feed_app.origin_circuits.clear()
+    site_to_feed_app.negative_cache.clear()
+    site_to_feed_app.session.cache.clear()
+
+    return site_to_feed_app
+
+
+class ListingServer:
+    """
+    A local site serving a listing page of <article> entries.
+    """
+
+    def __init__(self):
+        self.entry_count = 3
+        # Paths requested so far
+        self.requests = []
+        # Seconds to wait before responding, and status for /posts/ pages
+        self.delay = 0
+        self.post_status = 200
+        # Highest number of requests handled at the same time
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append(self.path)
+                    server.active += 1
+                    server.peak_active = max(
+                        server.peak_active, server.active)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.active -= 1
+                if self.path.startswith('/posts/'):
+                    status = server.post_status
+                    body = server.render_post(self.path).encode('utf-8')
+                else:
+                    status = 200
+                    body = server.render().encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/"
+
+    def render(self) -> str:
+        articles = ''.join(
+            f'<article><a href="/posts/{i}">Post {i}</a><p>Teaser {i}</p></article>'
+            for i in range(self.entry_count)
+        )
+        return f'<html><head><title>Listing</title></head><body>{articles}</body></html>'
+
+    def render_post(self, path: str) -> str:
+        return f'<html><body><nav>Menu</nav><article><p>Full text of {path}</p></article></body></html>'
+
+
+@pytest.fixture
+def make_listing_server():
+    servers = []
+
+    def make() -> ListingServer:
+        server = ListingServer()
+        thread = threading.Thread(
+            target=server.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+@pytest.fixture
+def listing_server(make_listing_server):
+    return make_listing_server()
+
+
+@pytest.fixture
+def create_feed(app_module):
+    def create(feed_id: str, url: str, **overrides) -> None:
+        config = {
+            'url': url,
+            'global_search_pattern': '*',
+            'item_search_pattern': '<article>\n<a>\nhref\n<p>',
+            'feed_title': 'Listing',
+            'feed_link': url,
+            'feed_description': 'Test feed',
+            'item_title_position': 1,
+            'item_link_position': 2,
+            'item_content_position': 3,
+            'feed_type': 'atom',
+            'refresh_interval': app_module.DEFAULT_REFRESH_INTERVAL,
+            'last_refreshed': 0,
+            'entry_links': []
+        }
+        config.update(overrides)
+
+        feed_filepath = f"{app_module.FEEDS_DIRECTORY}/{feed_id}"
+        with open(f"{feed_filepath}.toml", 'w') as file:
+            app_module.toml.dump(config, file)
+        with open(f"{feed_filepath}.xml", 'w') as file:
+            file.write('<feed/>')
+
+    return create
+
+
+@pytest.fixture
+def wait_for_refresh(app_module):
+    def wait(feed_id: str, timeout: float = 5) -> None:
+        deadline = time.time() + timeout
+        while feed_id in app_module.refreshing_feeds and time.time() < deadline:
+            time.sleep(0.01)
+
+    return wait
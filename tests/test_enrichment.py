@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from site_to_feed.app import FeedEntry
+
+
+@pytest.fixture
+def entries(listing_server):
+    return [
+        FeedEntry(f"Post {i}", f"{listing_server.url}posts/{i}", f"Teaser {i}")
+        for i in range(3)
+    ]
+
+
+def test_entries_use_detail_page_content(app_module, entries):
+    enriched = app_module.enrich_feed_entries('feed', entries, '<article>')
+
+    assert [entry.content for entry in enriched] == [
+        f"Full text of /posts/{i}" for i in range(3)]
+
+
+def test_only_new_links_are_fetched(app_module, listing_server, entries):
+    app_module.enrich_feed_entries('feed', entries[:2], '<article>')
+    listing_server.requests.clear()
+
+    enriched = app_module.enrich_feed_entries('feed', entries, '<article>')
+
+    assert listing_server.requests == ['/posts/2']
+    assert enriched[0].content == 'Full text of /posts/0'
+
+
+def test_slow_detail_pages_keep_listing_content(app_module, listing_server, entries, monkeypatch):
+    monkeypatch.setattr(app_module, 'DETAIL_FETCH_TIME_BUDGET', 0.2)
+    listing_server.delay = 1
+
+    started = time.time()
+    enriched = app_module.enrich_feed_entries('feed', entries, '<article>')
+
+    assert time.time() - started < 1
+    assert [entry.content for entry in enriched] == [
+        entry.content for entry in entries]
+
+
+def test_failing_detail_pages_do_not_block_listing(app_module, listing_server, entries):
+    listing_server.post_status = 500
+
+    for _ in range(app_module.CIRCUIT_BREAKER_THRESHOLD):
+        app_module.enrich_feed_entries('feed', entries, '<article>')
+
+    assert app_module.get_html(listing_server.url).error is None
+
+
+def test_detail_fetches_are_capped_per_host(app_module, listing_server):
+    listing_server.delay = 0.1
+    entries = [
+        FeedEntry(f"Post {i}", f"{listing_server.url}posts/{i}", f"Teaser {i}")
+        for i in range(6)
+    ]
+
+    enriched = app_module.enrich_feed_entries('feed', entries, '<article>')
+
+    assert listing_server.peak_active == app_module.DETAIL_MAX_CONCURRENCY_PER_HOST
+    assert all(entry.content.startswith('Full text') for entry in enriched)
+
+
+def test_slow_host_does_not_starve_other_hosts(app_module, make_listing_server, monkeypatch):
+    monkeypatch.setattr(app_module, 'DETAIL_FETCH_TIME_BUDGET', 0.5)
+    slow_server = make_listing_server()
+    slow_server.delay = 1
+    fast_server = make_listing_server()
+
+    slow_entries = [
+        FeedEntry(f"Post {i}", f"{slow_server.url}posts/{i}", f"Teaser {i}")
+        for i in range(app_module.DETAIL_MAX_WORKERS * 2)
+    ]
+    fast_entries = [
+        FeedEntry(f"Post {i}", f"{fast_server.url}posts/{i}", f"Teaser {i}")
+        for i in range(3)
+    ]
+
+    slow_enrichment = threading.Thread(
+        target=app_module.enrich_feed_entries, args=('slow', slow_entries, '<article>'))
+    slow_enrichment.start()
+    time.sleep(0.1)
+
+    started = time.time()
+    enriched = app_module.enrich_feed_entries('fast', fast_entries, '<article>')
+    elapsed = time.time() - started
+    slow_enrichment.join()
+
+    # The fast host's fetches don't wait behind fetches for the slow host
+    assert elapsed < 0.3
+    assert all(entry.content.startswith('Full text') for entry in enriched)
+    assert slow_server.peak_active <= app_module.DETAIL_MAX_CONCURRENCY_PER_HOST
@@ -0,0 +1,46 @@
+import time
+
+
+def test_expired_negative_cache_entries_are_pruned(app_module):
+    now = 1000.0
+    app_module.negative_cache['http://a.example/gone'] = (
+        app_module.FetchResult(None, '<p>Error</p>'), now - 1)
+    app_module.negative_cache['http://a.example/missing'] = (
+        app_module.FetchResult(None, '<p>Error</p>'), now + 1)
+
+    with app_module.fetch_state_lock:
+        app_module.prune_fetch_state(now)
+
+    assert list(app_module.negative_cache) == ['http://a.example/missing']
+
+
+def test_quiet_closed_circuits_are_pruned(app_module):
+    now = 100000.0
+    reset_after = app_module.CIRCUIT_BREAKER_RESET_AFTER
+    app_module.origin_circuits[('listing', 'http://quiet.example')] = app_module.OriginCircuit(
+        1, 0, now - reset_after)
+    app_module.origin_circuits[('listing', 'http://recent.example')] = app_module.OriginCircuit(
+        1, 0, now - 1)
+    app_module.origin_circuits[('listing', 'http://open.example')] = app_module.OriginCircuit(
+        5, now + 60, now - reset_after)
+
+    app_module.record_origin_failure(('listing', 'http://other.example'), now)
+
+    assert set(app_module.origin_circuits) == {
+        ('listing', 'http://recent.example'),
+        ('listing', 'http://open.example'),
+        ('listing', 'http://other.example'),
+    }
+
+
+def test_circuit_opens_after_repeated_failures(app_module):
+    circuit_key = ('listing', 'http://down.example')
+    now = time.time()
+
+    for _ in range(app_module.CIRCUIT_BREAKER_THRESHOLD):
+        app_module.record_origin_failure(circuit_key, now)
+
+    origin_circuit = app_module.origin_circuits[circuit_key]
+    assert origin_circuit.open_until == now + app_module.CIRCUIT_BREAKER_BASE_DELAY
+    fetch_result = app_module.get_html('http://down.example/page')
+    assert 'temporarily unavailable' in fetch_result.error
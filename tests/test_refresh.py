@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+from site_to_feed.app import FeedConfig
+
+
+def refresh(app_module, feed_id: str) -> FeedConfig:
+    with app_module.app.test_request_context():
+        app_module.refresh_feed(feed_id)
+    return FeedConfig(f"{app_module.FEEDS_DIRECTORY}/{feed_id}.toml")
+
+
+def make_due(config: FeedConfig) -> None:
+    config.last_refreshed = 0
+    config.save()
+
+
+def test_refresh_interval_adapts_to_page_changes(app_module, listing_server, create_feed):
+    create_feed('feed', listing_server.url)
+    initial_interval = app_module.DEFAULT_REFRESH_INTERVAL
+
+    # The first refresh finds entries that were not recorded before
+    config = refresh(app_module, 'feed')
+    assert config.refresh_interval == initial_interval // 2
+    assert config.change_count == 1
+
+    # An unchanged page backs the interval off
+    make_due(config)
+    config = refresh(app_module, 'feed')
+    assert config.refresh_interval == initial_interval
+    assert config.change_count == 1
+
+    # New entries on the page tighten the interval again, even though the
+    # page was previously served from the HTTP cache
+    listing_server.entry_count = 5
+    make_due(config)
+    config = refresh(app_module, 'feed')
+    assert config.refresh_interval == initial_interval // 2
+    assert config.change_count == 2
+    assert config.refresh_count == 3
+
+    with open(f"{app_module.FEEDS_DIRECTORY}/feed.xml") as file:
+        assert file.read().count('<entry>') == 5
+
+
+def test_refresh_is_skipped_until_due(app_module, listing_server, create_feed):
+    create_feed('feed', listing_server.url)
+
+    config = refresh(app_module, 'feed')
+    last_refreshed = config.last_refreshed
+
+    listing_server.entry_count = 5
+    config = refresh(app_module, 'feed')
+    assert config.last_refreshed == last_refreshed
+    assert config.refresh_count == 1
+
+
+def test_refresh_interval_is_clamped(app_module):
+    assert app_module.compute_refresh_interval(
+        app_module.MIN_REFRESH_INTERVAL, True) == app_module.MIN_REFRESH_INTERVAL
+    assert app_module.compute_refresh_interval(
+        app_module.MAX_REFRESH_INTERVAL, False) == app_module.MAX_REFRESH_INTERVAL
+
+
+def test_feed_file_serves_existing_feed_while_refreshing(app_module, listing_server, create_feed, wait_for_refresh):
+    create_feed('feed', listing_server.url)
+    listing_server.delay = 0.5
+    client = app_module.app.test_client()
+
+    response = client.get('/feeds/feed.xml')
+    assert response.get_data(as_text=True) == '<feed/>'
+    response.close()
+
+    wait_for_refresh('feed')
+    response = client.get('/feeds/feed.xml')
+    assert response.get_data(as_text=True).count('<entry>') == 3
+    response.close()
+
+
+def test_due_feeds_refresh_without_requests(app_module, listing_server, create_feed):
+    create_feed('due', listing_server.url)
+    create_feed('not-due', listing_server.url, last_refreshed=time.time())
+
+    app_module.refresh_due_feeds(time.time())
+
+    assert FeedConfig(f"{app_module.FEEDS_DIRECTORY}/due.toml").refresh_count == 1
+    assert FeedConfig(f"{app_module.FEEDS_DIRECTORY}/not-due.toml").refresh_count == 0
+
+
+def test_refreshes_of_one_origin_are_spaced(app_module, listing_server, create_feed, monkeypatch):
+    monkeypatch.setattr(app_module, 'ORIGIN_MIN_FETCH_INTERVAL', 60)
+    create_feed('first', listing_server.url)
+    create_feed('second', listing_server.url)
+
+    app_module.refresh_due_feeds(time.time())
+
+    refresh_counts = [
+        FeedConfig(f"{app_module.FEEDS_DIRECTORY}/{feed_id}.toml").refresh_count
+        for feed_id in ('first', 'second')
+    ]
+    assert refresh_counts == [1, 0]
+
+
+def test_scheduler_refreshes_due_feeds(app_module, listing_server, create_feed, monkeypatch):
+    monkeypatch.setattr(app_module, 'REFRESH_SCHEDULER_INTERVAL', 0.05)
+    monkeypatch.setattr(app_module, 'refresh_scheduler_stop', threading.Event())
+    create_feed('feed', listing_server.url)
+
+    app_module.start_refresh_scheduler()
+    try:
+        config_filepath = f"{app_module.FEEDS_DIRECTORY}/feed.toml"
+        deadline = time.time() + 5
+        while FeedConfig(config_filepath).refresh_count == 0 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        app_module.refresh_scheduler_stop.set()
+
+    assert FeedConfig(config_filepath).refresh_count == 1
+
+
+def test_removed_or_reordered_entries_are_not_changes(app_module, listing_server, create_feed):
+    listing_server.entry_count = 5
+    create_feed('feed', listing_server.url)
+    config = refresh(app_module, 'feed')
+    assert config.change_count == 1
+
+    listing_server.entry_count = 3
+    make_due(config)
+    config = refresh(app_module, 'feed')
+    assert config.change_count == 1
+
+
+def test_first_refresh_without_recorded_entries_is_unchanged(app_module, listing_server, create_feed):
+    create_feed('feed', listing_server.url)
+    config = FeedConfig(f"{app_module.FEEDS_DIRECTORY}/feed.toml")
+    del config._data['entry_links']
+    config.save()
+
+    config = refresh(app_module, 'feed')
+    assert config.change_count == 0
+    assert config.refresh_interval == app_module.DEFAULT_REFRESH_INTERVAL * 2
+
+
+def test_editing_feed_keeps_refresh_interval(app_module, listing_server, create_feed):
+    create_feed('feed', listing_server.url)
+    client = app_module.app.test_client()
+
+    client.post('/feeds/feed', data={'feed-title': 'Renamed'})
+    client.post('/feeds/feed', data={'feed-description': 'Edited'})
+
+    config = FeedConfig(f"{app_module.FEEDS_DIRECTORY}/feed.toml")
+    assert config.refresh_interval == app_module.DEFAULT_REFRESH_INTERVAL
+    assert config.refresh_count == 0
+    assert config.last_refreshed > 0
+    assert not [
+        filename for filename in os.listdir(app_module.FEEDS_DIRECTORY)
+        if filename.endswith('.tmp')]
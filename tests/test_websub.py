@@ -0,0 +1,242 @@
+import hashlib
+import hmac
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+BASE_URL = 'http://feeds.example'
+
+
+class SubscriberServer:
+    """
+    A local WebSub subscriber that echoes verification challenges and
+    records content notifications.
+    """
+
+    def __init__(self):
+        self.verifications = []
+        self.notifications = []
+        # Status codes returned for successive notifications, then 200
+        self.statuses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(
+                    urlsplit(self.path).query).items()}
+                server.verifications.append(params)
+                body = params.get('hub.challenge', '').encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                server.notifications.append((dict(self.headers), body))
+                status = server.statuses.pop(0) if server.statuses else 200
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.callback = f"http://127.0.0.1:{self.httpd.server_port}/callback"
+
+
+@pytest.fixture
+def subscriber():
+    server = SubscriberServer()
+    thread = threading.Thread(
+        target=server.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def websub(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'BASE_URL', BASE_URL)
+    monkeypatch.setattr(app_module, 'WEBSUB_SUBSCRIPTIONS_FILEPATH',
+                        str(tmp_path / 'websub_subscriptions.toml'))
+    # Deliveries are driven by the tests instead of the background worker
+    monkeypatch.setattr(app_module, 'run_websub_worker', lambda: None)
+    app_module.websub_pending_feeds.clear()
+    app_module.websub_retries.clear()
+    return app_module
+
+
+def subscribe(app_module, feed_id: str, callback: str, secret: str = '') -> None:
+    subscriptions = app_module.WebSubSubscriptions(
+        app_module.WEBSUB_SUBSCRIPTIONS_FILEPATH)
+    subscriptions.add(feed_id, callback, app_module.get_feed_url(feed_id),
+                      app_module.get_websub_hub_url(), secret, time.time() + 3600)
+    subscriptions.save()
+
+
+def get_subscriptions(app_module, feed_id: str) -> dict:
+    subscriptions = app_module.WebSubSubscriptions(
+        app_module.WEBSUB_SUBSCRIPTIONS_FILEPATH)
+    return subscriptions.get(feed_id, time.time())
+
+
+def test_subscribe_verifies_intent(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    client = websub.app.test_client()
+
+    response = client.post('/websub/hub', data={
+        'hub.mode': 'subscribe',
+        'hub.topic': f"{BASE_URL}/feeds/feed.xml",
+        'hub.callback': subscriber.callback,
+        'hub.lease_seconds': '3600'
+    })
+    assert response.status_code == 202
+
+    deadline = time.time() + 5
+    while not get_subscriptions(websub, 'feed') and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert subscriber.callback in get_subscriptions(websub, 'feed')
+    verification = subscriber.verifications[0]
+    assert verification['hub.mode'] == 'subscribe'
+    assert verification['hub.topic'] == f"{BASE_URL}/feeds/feed.xml"
+    assert verification['hub.lease_seconds'] == '3600'
+
+
+def test_subscribe_rejects_topics_outside_base_url(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    client = websub.app.test_client()
+
+    response = client.post('/websub/hub', data={
+        'hub.mode': 'subscribe',
+        'hub.topic': 'http://evil.example/feeds/feed.xml',
+        'hub.callback': subscriber.callback
+    })
+    assert response.status_code == 404
+
+
+def test_feed_links_ignore_request_host(websub, listing_server, create_feed, wait_for_refresh):
+    create_feed('feed', listing_server.url)
+    client = websub.app.test_client()
+
+    response = client.get('/feeds/feed.xml', headers={'Host': 'evil.example'})
+    response.close()
+    wait_for_refresh('feed')
+
+    with open(f"{websub.FEEDS_DIRECTORY}/feed.xml") as file:
+        feed_xml = file.read()
+    assert f'<link href="{BASE_URL}/websub/hub" rel="hub"/>' in feed_xml
+    assert f'<link href="{BASE_URL}/feeds/feed.xml" rel="self"/>' in feed_xml
+    assert 'evil.example' not in feed_xml
+    assert 'evil.example' not in response.headers['Link']
+
+
+def test_delivery_is_signed(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    subscribe(websub, 'feed', subscriber.callback, secret='s3cret')
+
+    websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(time.time())
+
+    headers, body = subscriber.notifications[0]
+    with open(f"{websub.FEEDS_DIRECTORY}/feed.xml", 'rb') as file:
+        assert body == file.read()
+    signature = hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+    assert headers['X-Hub-Signature'] == f"sha256={signature}"
+    assert headers['Content-Type'] == 'application/atom+xml'
+
+
+def test_repeated_updates_are_coalesced(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    subscribe(websub, 'feed', subscriber.callback)
+
+    for _ in range(3):
+        websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(time.time())
+
+    assert len(subscriber.notifications) == 1
+
+
+def test_failed_delivery_is_retried(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    subscribe(websub, 'feed', subscriber.callback)
+    subscriber.statuses = [500]
+
+    now = time.time()
+    websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(now)
+    assert len(subscriber.notifications) == 1
+    assert len(websub.websub_retries) == 1
+
+    # The retry waits for its backoff delay
+    websub.deliver_websub_notifications(now)
+    assert len(subscriber.notifications) == 1
+
+    websub.deliver_websub_notifications(now + websub.WEBSUB_RETRY_DELAY)
+    assert len(subscriber.notifications) == 2
+    assert not websub.websub_retries
+
+
+def test_fresh_update_replaces_queued_retry(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url)
+    subscribe(websub, 'feed', subscriber.callback)
+    subscriber.statuses = [500, 500]
+
+    now = time.time()
+    websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(now)
+    websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(now)
+
+    assert len(subscriber.notifications) == 2
+    assert len(websub.websub_retries) == 1
+
+
+def test_editing_feed_properties_publishes(websub, listing_server, create_feed):
+    create_feed('feed', listing_server.url)
+    client = websub.app.test_client()
+
+    client.post('/feeds/feed', data={})
+    websub.websub_pending_feeds.clear()
+
+    # Regenerating an unchanged feed does not notify subscribers
+    client.post('/feeds/feed', data={})
+    assert not websub.websub_pending_feeds
+
+    client.post('/feeds/feed', data={'feed-title': 'Renamed'})
+    assert websub.websub_pending_feeds == {'feed'}
+
+
+@pytest.mark.parametrize('feed_type, hub_link', [
+    ('atom', f'<link href="{BASE_URL}/websub/hub" rel="hub"/>'),
+    ('rss', f'<atom:link href="{BASE_URL}/websub/hub" rel="hub"/>'),
+])
+def test_feeds_advertise_hub(websub, listing_server, create_feed, feed_type, hub_link):
+    create_feed('feed', listing_server.url, feed_type=feed_type)
+
+    websub.refresh_feed('feed')
+
+    with open(f"{websub.FEEDS_DIRECTORY}/feed.xml") as file:
+        feed_xml = file.read()
+    assert hub_link in feed_xml
+    if feed_type == 'rss':
+        assert f'<atom:link href="{BASE_URL}/feeds/feed.xml" rel="self"/>' in feed_xml
+        assert f'<link>{listing_server.url}</link>' in feed_xml
+
+
+def test_rss_delivery_content_type(websub, listing_server, create_feed, subscriber):
+    create_feed('feed', listing_server.url, feed_type='rss')
+    subscribe(websub, 'feed', subscriber.callback)
+
+    websub.publish_feed_update('feed')
+    websub.deliver_websub_notifications(time.time())
+
+    headers, _ = subscriber.notifications[0]
+    assert headers['Content-Type'] == 'application/rss+xml'